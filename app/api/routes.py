@@ -5,16 +5,16 @@ This module defines all API endpoints including health checks and
 the main prediction endpoint for image classification.
 """
 
-import io
+import asyncio
 import logging
 
-from fastapi import APIRouter, File, HTTPException, UploadFile, status
-from PIL import Image
+from fastapi import APIRouter, File, HTTPException, Request, UploadFile, status
+from fastapi.responses import ORJSONResponse
 
-from app.api.schemas import (ErrorResponse, HealthResponse, PredictionResponse,
-                             PredictionResult)
+from app.api.schemas import ErrorResponse, HealthResponse, PredictionResponse
 from app.core.config import settings
-from app.models.classifier import get_classifier
+from app.models.classifier import get_batcher, get_classifier
+from app.utils.cache import get_prediction_cache
 
 logger = logging.getLogger(__name__)
 
@@ -61,7 +61,9 @@ async def health_check():
     },
 )
 async def predict_image(
-    file: UploadFile = File(..., description="Image file to classify"), top_k: int = 5
+    request: Request,
+    file: UploadFile = File(..., description="Image file to classify"),
+    top_k: int = 5,
 ):
     """
     Predict the class of an uploaded image.
@@ -70,11 +72,13 @@ async def predict_image(
     with their confidence scores using a pre-trained ResNet-18 model.
 
     Args:
+        request: Incoming request (used to reach the inference thread pool)
         file: Uploaded image file (JPEG, PNG, etc.)
         top_k: Number of top predictions to return (default: 5, max: 10)
 
     Returns:
-        PredictionResponse with top K predictions and confidence scores
+        JSON response matching PredictionResponse, with top K predictions
+        and confidence scores
 
     Raises:
         HTTPException: If the image is invalid or prediction fails
@@ -94,33 +98,63 @@ async def predict_image(
         )
 
     try:
-        # Read and validate image
+        # Read raw image bytes; decoding happens in the classifier so JPEGs
+        # can go straight to nvJPEG on GPU
         contents = await file.read()
-        image = Image.open(io.BytesIO(contents))
 
-        logger.info(
-            f"Processing image: {file.filename}, size: {image.size}, mode: {image.mode}"
-        )
-
-        # Get classifier and make prediction
-        classifier = get_classifier()
-        predictions = classifier.predict(image, top_k=top_k)
-
-        # Format response
-        prediction_results = [
-            PredictionResult(class_name=class_name, confidence=confidence)
-            for class_name, confidence in predictions
-        ]
-
-        logger.info(
-            f"Prediction successful for {file.filename}. "
-            f"Top prediction: {predictions[0][0]} ({predictions[0][1]:.2%})"
-        )
-
-        return PredictionResponse(
-            success=True,
-            predictions=prediction_results,
-            message=f"Successfully classified {file.filename}",
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Processing image",
+                extra={
+                    "image_filename": file.filename,
+                    "image_bytes": len(contents),
+                    "content_type": file.content_type,
+                },
+            )
+
+        # Identical uploads are answered from cache without touching the model
+        cache = get_prediction_cache()
+        cache_key = cache.make_key(contents, top_k)
+        predictions = await cache.get(cache_key) if cache_key else None
+        cache_hit = predictions is not None
+
+        if not cache_hit:
+            # Preprocess off the event loop, then queue for a batched forward
+            # pass. Without a lifespan-managed pool this uses the loop default.
+            classifier = get_classifier()
+            infer_pool = getattr(request.app.state, "infer_pool", None)
+            img_tensor = await asyncio.get_running_loop().run_in_executor(
+                infer_pool, classifier.preprocess_bytes, contents, file.content_type
+            )
+            predictions = await get_batcher().submit(img_tensor, top_k)
+
+            if cache_key:
+                await cache.set(cache_key, predictions)
+
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                "Prediction successful",
+                extra={
+                    "image_filename": file.filename,
+                    "top_class": predictions[0][0],
+                    "top_confidence": predictions[0][1],
+                    "cached": cache_hit,
+                },
+            )
+
+        # Returned as a plain dict serialized by orjson: the predictions are
+        # produced by the model, so re-validating them through
+        # PredictionResponse (kept as response_model for the OpenAPI schema)
+        # would only cost time
+        return ORJSONResponse(
+            content={
+                "success": True,
+                "predictions": [
+                    {"class_name": class_name, "confidence": confidence}
+                    for class_name, confidence in predictions
+                ],
+                "message": f"Successfully classified {file.filename}",
+            }
         )
 
     except Exception as e:
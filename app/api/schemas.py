@@ -5,7 +5,7 @@ This module defines all data models used for API request and response validation
 ensuring type safety and automatic documentation.
 """
 
-from typing import List, Tuple
+from typing import List
 
 from pydantic import BaseModel, Field
 
@@ -29,12 +29,32 @@ class Settings(BaseSettings):
     debug: bool = False
     host: str = "0.0.0.0"
     port: int = 8000
+    max_upload_size: int = 10 * 1024 * 1024  # Max request body size (bytes)
 
     # ML Model Settings
     model_name: str = (
         "resnet18"  # Options: resnet18, resnet50, resnet101, efficientnet_b2
     )
     model_device: Optional[str] = None  # None = auto-detect (CUDA if available)
+    backend: str = "torch"  # Inference runtime: 'torch' or 'onnx'
+    model_compile: bool = False  # torch.compile the model at load time
+    quantize: Optional[str] = None  # None, 'int8' (CPU only) or 'bf16'
+    weights_cache_dir: Optional[str] = None  # None = torch hub checkpoints dir
+    preprocess_backend: str = "opencv"  # CPU resize/normalize: 'opencv' or 'numba'
+
+    # Batching Settings
+    batch_max_size: int = 32  # Max images coalesced into one forward pass
+    batch_max_wait_ms: int = 10  # Max time to wait for a batch to fill
+
+    # Inference Threading
+    inference_threads: int = 4  # Thread pool size for preprocessing + inference
+    torch_threads: Optional[int] = None  # Intra-op threads; None = PyTorch default
+
+    # Prediction Cache
+    prediction_cache_size: int = 4096  # In-process LRU entries (0 disables caching)
+    prediction_cache_max_bytes: int = 5 * 1024 * 1024  # Skip caching larger uploads
+    prediction_cache_redis_url: Optional[str] = None  # Shared cache across workers
+    prediction_cache_ttl: int = 3600  # Redis entry expiry (seconds)
 
     # Logging
     log_level: str = "INFO"
@@ -8,11 +8,29 @@ and human-readable logging for development.
 import logging
 import sys
 
+import orjson
 from pythonjsonlogger import jsonlogger
 
 from app.core.config import settings
 
 
+def _orjson_dumps(obj, default=None, **kwargs) -> str:
+    """
+    Serialize a log record with orjson.
+
+    Drop-in ``json_serializer`` for ``JsonFormatter``; stdlib ``json.dumps``
+    options it passes (``cls``, ``indent``, ...) are ignored.
+
+    Args:
+        obj: Log record dictionary
+        default: Fallback for objects orjson cannot serialize natively
+
+    Returns:
+        JSON string
+    """
+    return orjson.dumps(obj, default=default or str).decode()
+
+
 def setup_logging():
     """
     Configure application logging.
@@ -35,6 +53,7 @@ def setup_logging():
         formatter = jsonlogger.JsonFormatter(
             fmt="%(asctime)s %(name)s %(levelname)s %(message)s",
             datefmt="%Y-%m-%d %H:%M:%S",
+            json_serializer=_orjson_dumps,
         )
     else:
         # Plain text formatter for development
@@ -0,0 +1,52 @@
+"""
+ASGI middleware for the application.
+
+This module provides lightweight, pure ASGI middleware that runs before
+request bodies are read.
+"""
+
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+
+class MaxUploadSizeMiddleware:
+    """
+    Reject requests whose declared body size exceeds a limit.
+
+    The ``Content-Length`` header is checked before the body is received,
+    so oversized uploads are refused with 413 without being buffered into
+    memory or spooled to disk.
+    """
+
+    def __init__(self, app: ASGIApp, max_upload_size: int):
+        """
+        Initialize the middleware.
+
+        Args:
+            app: The ASGI application to wrap
+            max_upload_size: Maximum accepted request body size in bytes
+        """
+        self.app = app
+        self.max_upload_size = max_upload_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        """Handle an ASGI request."""
+        if scope["type"] == "http":
+            content_length = Headers(scope=scope).get("content-length")
+            if (
+                content_length is not None
+                and content_length.isdigit()
+                and int(content_length) > self.max_upload_size
+            ):
+                response = JSONResponse(
+                    status_code=413,
+                    content={
+                        "detail": f"Upload exceeds the maximum size of "
+                        f"{self.max_upload_size} bytes"
+                    },
+                )
+                await response(scope, receive, send)
+                return
+
+        await self.app(scope, receive, send)
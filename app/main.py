@@ -6,14 +6,20 @@ routers, and configuration.
 """
 
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import asynccontextmanager
 
+import torch
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
 from app.api.routes import router
 from app.core.config import settings
 from app.core.logging import setup_logging
+from app.core.middleware import MaxUploadSizeMiddleware
+from app.core.torch_backends import setup_torch_backends
+from app.models.classifier import get_batcher, get_classifier
 
 # Setup logging
 setup_logging()
@@ -33,10 +39,32 @@ async def lifespan(app: FastAPI):
     logger.info(f"Model: {settings.model_name}")
     logger.info(f"Device: {settings.model_device or 'auto-detect'}")
 
+    if settings.torch_threads:
+        torch.set_num_threads(settings.torch_threads)
+
+    # cuDNN autotuning and TF32 for the fixed-shape forward passes
+    setup_torch_backends()
+
+    # Load and warm up the model before accepting traffic, so the first
+    # request to each worker does not pay the model load
+    get_classifier().warmup()
+
+    # Dedicated pool for blocking decode/preprocess and forward passes, so
+    # they never run on the event loop (PyTorch releases the GIL)
+    app.state.infer_pool = ThreadPoolExecutor(
+        max_workers=settings.inference_threads, thread_name_prefix="inference"
+    )
+
+    # Start the request batcher on the server's event loop
+    batcher = get_batcher()
+    batcher.start(executor=app.state.infer_pool)
+
     yield
 
     # Shutdown
     logger.info("Shutting down ML API application...")
+    await batcher.stop()
+    app.state.infer_pool.shutdown(wait=True)
 
 
 # Initialize FastAPI application
@@ -45,11 +73,16 @@ app = FastAPI(
     version=settings.api_version,
     description=settings.api_description,
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
     docs_url="/docs",
     redoc_url="/redoc",
     openapi_url="/openapi.json",
 )
 
+# Reject oversized uploads before their body is buffered. Added before CORS,
+# so the CORS middleware wraps it and 413 responses carry the CORS headers
+app.add_middleware(MaxUploadSizeMiddleware, max_upload_size=settings.max_upload_size)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
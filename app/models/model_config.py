@@ -9,11 +9,13 @@ Available models:
 """
 
 import logging
-from typing import Optional
+import os
 
 import torch
 import torchvision.models as models
 
+from app.core.config import settings
+
 logger = logging.getLogger(__name__)
 
 
@@ -44,9 +46,9 @@ class ModelConfig:
     }
 
     @classmethod
-    def get_model(cls, model_name: str, device: str):
+    def load_pretrained(cls, model_name: str, device: str):
         """
-        Get a model by name.
+        Load a model's pre-trained FP32 weights, in eval mode.
 
         Args:
             model_name: Name of the model (resnet18, resnet50, etc.)
@@ -67,3 +69,117 @@ class ModelConfig:
         model.eval()
 
         return model
+
+    @classmethod
+    def get_model(cls, model_name: str, device: str):
+        """
+        Get a model by name, with the configured inference optimizations.
+
+        Args:
+            model_name: Name of the model (resnet18, resnet50, etc.)
+            device: Device to load model on ('cuda' or 'cpu')
+
+        Returns:
+            Loaded PyTorch model
+        """
+        model = cls.load_pretrained(model_name, device)
+
+        # Fold eval-mode BatchNorm into the preceding Conv weights. INT8 FX
+        # quantization performs the same fusion itself.
+        if settings.quantize != "int8":
+            model = cls.fuse_conv_bn(model)
+
+        # Channels-last (NHWC) lets oneDNN use packed-channel SIMD kernels on
+        # CPU and cuDNN use Tensor Core convolutions on GPU
+        model = model.to(memory_format=torch.channels_last)
+
+        if settings.quantize == "int8":
+            if device == "cpu":
+                model = cls.quantize_int8(model, model_name)
+            else:
+                logger.warning("INT8 quantization is CPU-only, keeping FP32 model")
+
+        return model
+
+    @classmethod
+    def fuse_conv_bn(cls, model: torch.nn.Module) -> torch.nn.Module:
+        """
+        Fold BatchNorm layers into their preceding convolutions.
+
+        Removes one kernel launch and one full activation read/write per
+        BatchNorm. Fusion is cheap (well under a second for ResNets), so the
+        fused weights are not cached.
+
+        Args:
+            model: Model in eval mode
+
+        Returns:
+            Fused FX GraphModule, or the original model if it cannot be traced
+        """
+        from torch.fx.experimental.optimization import fuse
+
+        try:
+            return fuse(model)
+        except Exception as e:
+            logger.warning(f"Conv+BN fusion failed, keeping unfused model: {e}")
+            return model
+
+    @classmethod
+    def cache_path(cls, filename: str) -> str:
+        """
+        Get the on-disk location of a derived model artifact.
+
+        Args:
+            filename: Name of the cached file (e.g. 'resnet18_int8.pt')
+
+        Returns:
+            Path inside the weights cache directory
+        """
+        cache_dir = settings.weights_cache_dir or os.path.join(
+            torch.hub.get_dir(), "checkpoints"
+        )
+        os.makedirs(cache_dir, exist_ok=True)
+        return os.path.join(cache_dir, filename)
+
+    @classmethod
+    def quantize_int8(cls, model: torch.nn.Module, model_name: str):
+        """
+        Statically quantize a CPU model to INT8 for the oneDNN backend.
+
+        The first run calibrates on a handful of dummy 224x224 inputs and
+        caches the quantized state dict; later runs rebuild the quantized
+        graph and load that state dict instead of re-calibrating.
+
+        Args:
+            model: FP32 model in eval mode on CPU
+            model_name: Name of the model, used as the cache key
+
+        Returns:
+            Quantized model
+        """
+        from torch.ao.quantization import get_default_qconfig_mapping
+        from torch.ao.quantization.quantize_fx import convert_fx, prepare_fx
+
+        torch.backends.quantized.engine = "onednn"
+        example_inputs = (torch.zeros(1, 3, 224, 224),)
+        prepared = prepare_fx(
+            model, get_default_qconfig_mapping("onednn"), example_inputs
+        )
+
+        cache_path = cls.cache_path(f"{model_name}_int8.pt")
+        if os.path.exists(cache_path):
+            logger.info(f"Loading cached INT8 weights from {cache_path}")
+            quantized = convert_fx(prepared)
+            quantized.load_state_dict(torch.load(cache_path, weights_only=True))
+            return quantized
+
+        logger.info(f"Calibrating INT8 quantization for {model_name}...")
+        with torch.no_grad():
+            for _ in range(8):
+                prepared(torch.randn(1, 3, 224, 224))
+
+        quantized = convert_fx(prepared)
+        torch.save(quantized.state_dict(), cache_path)
+        logger.info(f"Cached INT8 weights to {cache_path}")
+
+        return quantized
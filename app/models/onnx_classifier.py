@@ -0,0 +1,164 @@
+"""
+Image classifier backed by ONNX Runtime.
+
+The PyTorch model is exported to ONNX once and cached on disk; inference
+then runs through a single reused ``InferenceSession`` with all graph
+optimizations enabled (Conv+BN+ReLU fusion, constant folding). Inputs and
+outputs are bound directly to torch tensor memory via IO binding, so no
+copies are made between PyTorch and ONNX Runtime.
+"""
+
+import logging
+import os
+from typing import Optional
+
+import numpy as np
+import onnxruntime as ort
+import torch
+
+from app.models.classifier import CROP_SIZE, ImageClassifier
+
+logger = logging.getLogger(__name__)
+
+
+class OnnxImageClassifier(ImageClassifier):
+    """
+    Image classification with ONNX Runtime instead of eager PyTorch.
+
+    Preprocessing and postprocessing are inherited from ImageClassifier;
+    only the forward pass is replaced. ``model`` is set to a callable that
+    takes and returns torch tensors, so batching works unchanged.
+
+    Attributes:
+        session: The ONNX Runtime inference session (loaded on first prediction)
+    """
+
+    def __init__(self, device: Optional[str] = None):
+        """
+        Initialize the ONNX Runtime classifier.
+
+        Args:
+            device: Device to run inference on ('cuda' or 'cpu').
+                   If None, automatically selects CUDA if available.
+        """
+        super().__init__(device)
+        self.session: Optional[ort.InferenceSession] = None
+        # ONNX Runtime binds plain NCHW buffers
+        self.memory_format = torch.contiguous_format
+        self._num_classes = 0
+
+    def _providers(self) -> list:
+        """
+        Pick execution providers for the configured device.
+
+        Returns:
+            Available providers in order of preference
+        """
+        if self.device.startswith("cuda"):
+            preferred = ["CUDAExecutionProvider", "CPUExecutionProvider"]
+        else:
+            preferred = ["OpenVINOExecutionProvider", "CPUExecutionProvider"]
+
+        available = ort.get_available_providers()
+        return [provider for provider in preferred if provider in available]
+
+    def _export_onnx(self, model_name: str) -> str:
+        """
+        Export the PyTorch model to ONNX, unless already cached.
+
+        Args:
+            model_name: Name of the model to export
+
+        Returns:
+            Path to the ONNX file
+        """
+        from app.models.model_config import ModelConfig
+
+        onnx_path = ModelConfig.cache_path(f"{model_name}.onnx")
+        if os.path.exists(onnx_path):
+            return onnx_path
+
+        logger.info(f"Exporting {model_name} to ONNX...")
+        model = ModelConfig.load_pretrained(model_name, "cpu")
+        dummy = torch.zeros(1, 3, CROP_SIZE, CROP_SIZE)
+        torch.onnx.export(
+            model,
+            dummy,
+            onnx_path,
+            opset_version=17,
+            input_names=["input"],
+            output_names=["output"],
+            dynamic_axes={"input": {0: "batch"}, "output": {0: "batch"}},
+        )
+        logger.info(f"Exported ONNX model to {onnx_path}")
+
+        return onnx_path
+
+    def _load_model(self):
+        """
+        Load the ONNX Runtime session.
+
+        This method is called lazily on first prediction to optimize
+        startup time. The model is loaded only when needed.
+        """
+        if self.model is None:
+            from app.core.config import settings
+
+            if settings.quantize or settings.model_compile:
+                logger.warning(
+                    "QUANTIZE and MODEL_COMPILE are ignored by the ONNX backend"
+                )
+
+            onnx_path = self._export_onnx(settings.model_name)
+
+            options = ort.SessionOptions()
+            options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+            self.session = ort.InferenceSession(
+                onnx_path, options, providers=self._providers()
+            )
+            self._num_classes = self.session.get_outputs()[0].shape[1]
+            self.model = self._run_session
+            self._allocate_buffers(settings.batch_max_size)
+            logger.info(
+                f"ONNX Runtime session ready ({self.session.get_providers()[0]})"
+            )
+
+    def _run_session(self, batch: torch.Tensor) -> torch.Tensor:
+        """
+        Run a forward pass with inputs/outputs bound to torch memory.
+
+        Args:
+            batch: Preprocessed batch of shape (batch_size, 3, 224, 224)
+
+        Returns:
+            Logits of shape (batch_size, num_classes) on the same device
+        """
+        batch = batch.to(self.device).contiguous()
+        output = torch.empty(
+            (batch.shape[0], self._num_classes), dtype=torch.float32, device=self.device
+        )
+
+        device = torch.device(self.device)
+        device_type = "cuda" if device.type == "cuda" else "cpu"
+        device_id = device.index or 0
+
+        binding = self.session.io_binding()
+        binding.bind_input(
+            "input",
+            device_type,
+            device_id,
+            np.float32,
+            tuple(batch.shape),
+            batch.data_ptr(),
+        )
+        binding.bind_output(
+            "output",
+            device_type,
+            device_id,
+            np.float32,
+            tuple(output.shape),
+            output.data_ptr(),
+        )
+        self.session.run_with_iobinding(binding)
+
+        return output
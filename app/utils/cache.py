@@ -0,0 +1,136 @@
+"""
+Prediction cache keyed by image content.
+
+Repeated uploads of the same image (client retries, dashboards, popular
+images) are answered from cache without decoding or running the model.
+Entries are keyed by an xxHash of the raw upload bytes plus ``top_k``,
+held in an in-process LRU and optionally shared across workers via Redis.
+"""
+
+import json
+import logging
+from typing import List, Optional, Tuple
+
+import xxhash
+from cachetools import LRUCache
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class PredictionCache:
+    """
+    Two-level (in-process LRU + optional Redis) cache of predictions.
+
+    Attributes:
+        max_image_bytes: Uploads larger than this are never cached
+        ttl: Expiry (seconds) for entries stored in Redis
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        max_image_bytes: int,
+        redis_url: Optional[str] = None,
+        ttl: int = 3600,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            maxsize: Maximum number of entries in the in-process LRU (0 disables)
+            max_image_bytes: Uploads larger than this are never cached
+            redis_url: Optional Redis URL shared by all workers
+            ttl: Expiry (seconds) for entries stored in Redis
+        """
+        self.max_image_bytes = max_image_bytes
+        self.ttl = ttl
+        self._local: LRUCache = LRUCache(maxsize=maxsize)
+        self._redis = None
+
+        if redis_url:
+            import redis.asyncio as redis
+
+            self._redis = redis.from_url(redis_url)
+
+    def make_key(self, contents: bytes, top_k: int) -> Optional[str]:
+        """
+        Build the cache key for an upload.
+
+        Args:
+            contents: Raw upload bytes
+            top_k: Number of predictions requested
+
+        Returns:
+            Cache key, or None if the upload should not be cached
+        """
+        if self._local.maxsize == 0 or len(contents) > self.max_image_bytes:
+            return None
+        digest = xxhash.xxh3_64(contents).hexdigest()
+        return f"predict:{settings.model_name}:{digest}:{top_k}"
+
+    async def get(self, key: str) -> Optional[List[Tuple[str, float]]]:
+        """
+        Look up cached predictions.
+
+        Args:
+            key: Cache key from ``make_key``
+
+        Returns:
+            Cached predictions, or None on a miss
+        """
+        predictions = self._local.get(key)
+        if predictions is not None or self._redis is None:
+            return predictions
+
+        try:
+            cached = await self._redis.get(key)
+        except Exception as e:
+            logger.warning(f"Redis cache lookup failed: {str(e)}")
+            return None
+        if cached is None:
+            return None
+
+        predictions = [tuple(pred) for pred in json.loads(cached)]
+        self._local[key] = predictions
+        return predictions
+
+    async def set(self, key: str, predictions: List[Tuple[str, float]]):
+        """
+        Store predictions in the cache.
+
+        Args:
+            key: Cache key from ``make_key``
+            predictions: Predictions to cache
+        """
+        self._local[key] = predictions
+        if self._redis is None:
+            return
+
+        try:
+            await self._redis.set(key, json.dumps(predictions), ex=self.ttl)
+        except Exception as e:
+            logger.warning(f"Redis cache store failed: {str(e)}")
+
+
+# Global cache instance (singleton pattern)
+_cache_instance: Optional[PredictionCache] = None
+
+
+def get_prediction_cache() -> PredictionCache:
+    """
+    Get the global prediction cache instance (singleton).
+
+    Returns:
+        PredictionCache configured from settings
+    """
+    global _cache_instance
+    if _cache_instance is None:
+        _cache_instance = PredictionCache(
+            maxsize=settings.prediction_cache_size,
+            max_image_bytes=settings.prediction_cache_max_bytes,
+            redis_url=settings.prediction_cache_redis_url,
+            ttl=settings.prediction_cache_ttl,
+        )
+    return _cache_instance
@@ -10,5 +10,63 @@ import sys
 
 import pytest
 
+try:
+    import torch
+except ImportError:
+    # The test modules skip themselves via pytest.importorskip; a skip raised
+    # while loading conftest would abort the whole run instead
+    torch = None
+
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+# Run the shared classifier on CPU unless overridden; must be set before
+# app.core.config is imported
+os.environ.setdefault("MODEL_DEVICE", "cpu")
+
+
+def pytest_configure(config):
+    """Configure PyTorch for the test session.
+
+    Each test process runs PyTorch single-threaded, which avoids thread pool
+    startup, and oversubscription when pytest-xdist runs one worker per core
+    (``make test-parallel``).
+    """
+    if torch is None:
+        return
+
+    torch.set_num_threads(1)
+    torch.set_num_interop_threads(1)
+
+    # Same backend tuning as application startup: the tests run repeated
+    # fixed-shape forward passes
+    from app.core.torch_backends import setup_torch_backends
+
+    setup_torch_backends()
+
+
+def pytest_addoption(parser):
+    """Register command line options for the test session."""
+    parser.addoption(
+        "--model-mode",
+        choices=["eager", "compile", "torchscript"],
+        default="eager",
+        help="How the shared classifier runs its model: eager (default), "
+        "torch.compile'd or TorchScript-frozen once per session",
+    )
+    parser.addoption(
+        "--bf16",
+        action="store_true",
+        help="Run the shared classifier under bfloat16 autocast",
+    )
+
+
+@pytest.fixture(autouse=True, scope="session")
+def _no_grad():
+    """Run every test without autograd bookkeeping."""
+    if torch is None:
+        yield
+        return
+
+    with torch.inference_mode():
+        yield
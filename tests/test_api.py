@@ -11,7 +11,14 @@ import pytest
 from fastapi.testclient import TestClient
 from PIL import Image
 
-from app.main import app
+# Skip (rather than error out) when the ML stack is not installed
+pytest.importorskip("torch")
+pytest.importorskip("torchvision")
+pytest.importorskip("cv2")
+
+from app.api import routes  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.main import app  # noqa: E402
 
 # Create test client
 client = TestClient(app)
@@ -125,6 +132,17 @@ class TestPredictionEndpoint:
 
         assert response.status_code == 400
 
+    def test_predict_endpoint_rejects_oversized_upload(self):
+        """Test that uploads over the size limit are rejected with 413."""
+        oversized = b"\0" * (settings.max_upload_size + 1)
+        files = {"file": ("big.jpg", io.BytesIO(oversized), "image/jpeg")}
+        origin = "https://client.example.com"
+        response = client.post("/predict", files=files, headers={"Origin": origin})
+
+        assert response.status_code == 413
+        # The rejection passes through CORS, so cross-origin clients can read it
+        assert response.headers["access-control-allow-origin"] in ("*", origin)
+
     def test_predict_endpoint_with_invalid_top_k(self, sample_image_bytes):
         """Test prediction with invalid top_k value."""
         files = {"file": ("test.jpg", sample_image_bytes, "image/jpeg")}
@@ -149,6 +167,22 @@ class TestPredictionEndpoint:
         confidences = [pred["confidence"] for pred in predictions]
         assert confidences == sorted(confidences, reverse=True)
 
+    def test_repeated_image_served_from_cache(self, sample_image_bytes, monkeypatch):
+        """Test that an identical upload is answered without running the model."""
+        image_bytes = sample_image_bytes.getvalue()
+        files = {"file": ("test.jpg", image_bytes, "image/jpeg")}
+        first = client.post("/predict?top_k=4", files=files)
+
+        def fail_if_called():
+            raise AssertionError("model should not run on a cache hit")
+
+        monkeypatch.setattr(routes, "get_batcher", fail_if_called)
+        files = {"file": ("again.jpg", image_bytes, "image/jpeg")}
+        second = client.post("/predict?top_k=4", files=files)
+
+        assert second.status_code == 200
+        assert second.json()["predictions"] == first.json()["predictions"]
+
 
 class TestAPIDocumentation:
     """Tests for API documentation endpoints."""
@@ -5,27 +5,104 @@ This module contains unit tests for the ImageClassifier class,
 testing model initialization, preprocessing, and prediction functionality.
 """
 
+import asyncio
+import io
+
 import numpy as np
 import pytest
-import torch
 from PIL import Image
 
-from app.models.classifier import ImageClassifier, get_classifier
+# Skip (rather than error out) when the ML stack is not installed
+torch = pytest.importorskip("torch")
+transforms = pytest.importorskip("torchvision.transforms")
+cv2 = pytest.importorskip("cv2")
+pytest.importorskip("onnxruntime")
+
+from app.core.config import settings  # noqa: E402
+from app.models.classifier import (  # noqa: E402
+    ImageClassifier,
+    PredictionBatcher,
+    get_classifier,
+)
+from app.models.model_config import ModelConfig  # noqa: E402
+from app.models.onnx_classifier import OnnxImageClassifier  # noqa: E402
 
+# Values of K exercised by the top K prediction tests
+TOP_KS = [1, 3, 5, 10]
 
-@pytest.fixture
+
+@pytest.fixture(scope="session")
 def sample_image():
     """Create a sample RGB image for testing."""
-    # Create a 224x224 RGB image with random data
-    img_array = np.random.randint(0, 255, (224, 224, 3), dtype=np.uint8)
-    return Image.fromarray(img_array)
+    return Image.new("RGB", (224, 224))
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def grayscale_image():
     """Create a sample grayscale image for testing."""
-    img_array = np.random.randint(0, 255, (224, 224), dtype=np.uint8)
-    return Image.fromarray(img_array, mode="L")
+    return Image.new("L", (224, 224))
+
+
+@pytest.fixture(scope="module")
+def classifier(request):
+    """Warm up the global classifier (CPU in tests) and share it across tests.
+
+    The opt-in modes below modify the process-wide singleton, so its model,
+    autocast dtype and compiled batch sizes are restored when this module
+    finishes, before other modules (e.g. the API tests) use it.
+    """
+    classifier = get_classifier()
+    classifier._load_model()
+    original_model = classifier.model
+    original_autocast_dtype = classifier.autocast_dtype
+    original_batch_sizes = classifier._batch_sizes
+
+    # Opt-in: bfloat16 autocast, as with QUANTIZE=bf16
+    if request.config.getoption("--bf16"):
+        classifier.autocast_dtype = torch.bfloat16
+
+    # Opt-in: compile or script once (including warmup) so every test reuses
+    # the optimized graph
+    model_mode = request.config.getoption("--model-mode")
+    if model_mode == "compile":
+        classifier._compile_model()
+    elif model_mode == "torchscript":
+        scripted = torch.jit.optimize_for_inference(
+            torch.jit.freeze(torch.jit.script(classifier.model.eval()))
+        )
+        scripted(torch.zeros(1, 3, 224, 224))
+        classifier.model = scripted
+
+    yield classifier
+
+    classifier.model = original_model
+    classifier.autocast_dtype = original_autocast_dtype
+    classifier._batch_sizes = original_batch_sizes
+
+
+@pytest.fixture(scope="module")
+def sample_tensor(classifier, sample_image):
+    """Preprocess the sample image once, for tests that start from a tensor."""
+    return classifier.preprocess_image(sample_image)
+
+
+@pytest.fixture(scope="module")
+def sample_logits(classifier, sample_tensor):
+    """Run one forward pass over the sample image and cache its logits."""
+    with torch.inference_mode(), classifier._autocast():
+        return classifier.model(sample_tensor).float()
+
+
+@pytest.fixture(scope="module")
+def topk_from_cached(classifier, sample_logits):
+    """Derive the sample image's top K predictions from the cached logits."""
+    # Top K for the largest K is computed once; smaller K are its prefixes
+    predictions = classifier.postprocess(sample_logits, [max(TOP_KS)])[0]
+
+    def topk(k):
+        return predictions[:k]
+
+    return topk
 
 
 class TestImageClassifier:
@@ -45,96 +122,288 @@ class TestImageClassifier:
         classifier = ImageClassifier(device="cpu")
         assert classifier.device == "cpu"
 
-    def test_preprocess_rgb_image(self, sample_image):
+    def test_preprocess_rgb_image(self, classifier, sample_image):
         """Test preprocessing of RGB images."""
-        classifier = ImageClassifier()
         tensor = classifier.preprocess_image(sample_image)
 
         # Check tensor shape: [batch_size, channels, height, width]
         assert tensor.shape == (1, 3, 224, 224)
         assert isinstance(tensor, torch.Tensor)
 
-    def test_preprocess_grayscale_image(self, grayscale_image):
+    def test_preprocess_grayscale_image(self, classifier, grayscale_image):
         """Test preprocessing converts grayscale to RGB."""
-        classifier = ImageClassifier()
         tensor = classifier.preprocess_image(grayscale_image)
 
         # Should be converted to RGB
         assert tensor.shape == (1, 3, 224, 224)
 
-    def test_predict_returns_top_k(self, sample_image):
-        """Test that predict returns correct number of predictions."""
-        classifier = ImageClassifier()
-        predictions = classifier.predict(sample_image, top_k=5)
+    def test_preprocess_matches_torchvision_pipeline(self, classifier):
+        """Test that the fused transform matches the reference torchvision one."""
+        reference = transforms.Compose(
+            [
+                transforms.Resize(256),
+                transforms.CenterCrop(224),
+                transforms.ToTensor(),
+                transforms.Normalize(
+                    mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225]
+                ),
+            ]
+        )
+        img_array = np.random.randint(0, 255, (300, 451, 3), dtype=np.uint8)
+        image = Image.fromarray(img_array)
+
+        torch.testing.assert_close(classifier.transform(image), reference(image))
+
+    @pytest.mark.parametrize("top_k", TOP_KS)
+    def test_postprocess_top_k_from_cached_logits(self, topk_from_cached, top_k):
+        """Test that postprocess on cached logits yields K valid, sorted predictions."""
+        predictions = topk_from_cached(top_k)
+
+        assert len(predictions) == top_k and all(
+            type(pred) is tuple and len(pred) == 2 for pred in predictions
+        )
+
+        class_names = [class_name for class_name, _ in predictions]
+        probabilities = [prob for _, prob in predictions]
+        assert all(isinstance(class_name, str) for class_name in class_names)
 
-        assert len(predictions) == 5
-        assert all(isinstance(pred, tuple) for pred in predictions)
-        assert all(len(pred) == 2 for pred in predictions)
+        # All probabilities should be between 0 and 1
+        probs = torch.tensor(probabilities)
+        assert torch.all((probs >= 0) & (probs <= 1))
 
-    def test_predict_probabilities_sum_to_one(self, sample_image):
-        """Test that prediction probabilities are valid."""
-        classifier = ImageClassifier()
-        predictions = classifier.predict(sample_image, top_k=5)
+        # Check that probabilities are in descending order
+        assert all(
+            earlier >= later for earlier, later in zip(probabilities, probabilities[1:])
+        )
+
+    def test_preprocess_bytes_with_opencv(self, classifier, monkeypatch):
+        """Test that PNG/JPEG bytes go through OpenCV's INTER_AREA resize.
+
+        This is a different resize filter than preprocess_image's bilinear
+        one, so the result is compared with an explicit OpenCV reference
+        rather than with the PIL path.
+        """
+        img_array = np.random.randint(0, 255, (240, 320, 3), dtype=np.uint8)
+        buffer = io.BytesIO()
+        Image.fromarray(img_array).save(buffer, format="PNG")
+
+        # Record what the OpenCV branch returns: a None result would silently
+        # fall back to the PIL pipeline
+        opencv_results = []
+        preprocess_opencv = classifier._preprocess_opencv
+
+        def spy(contents):
+            opencv_results.append(preprocess_opencv(contents))
+            return opencv_results[-1]
+
+        monkeypatch.setattr(classifier, "_preprocess_opencv", spy)
+        tensor = classifier.preprocess_bytes(buffer.getvalue(), "image/png")
+
+        assert len(opencv_results) == 1 and opencv_results[0] is tensor
+        bgr = cv2.imdecode(np.frombuffer(buffer.getvalue(), np.uint8), cv2.IMREAD_COLOR)
+        resized = cv2.resize(
+            bgr, classifier._resized_size(320, 240), interpolation=cv2.INTER_AREA
+        )
+        rgb = cv2.cvtColor(classifier._center_crop(resized), cv2.COLOR_BGR2RGB)
+        expected = classifier._normalize(rgb)
+        assert tensor.shape == (1, 3, 224, 224)
+        torch.testing.assert_close(tensor[0], expected, atol=1e-5, rtol=0)
 
-        # All probabilities should be between 0 and 1
-        for class_name, prob in predictions:
-            assert 0 <= prob <= 1
-            assert isinstance(class_name, str)
+    def test_preprocess_with_numba_kernel(self, monkeypatch):
+        """Test that the Numba kernel matches bilinear resize + crop + normalize."""
+        pytest.importorskip("numba")
+        monkeypatch.setattr(settings, "preprocess_backend", "numba")
+        classifier = ImageClassifier(device="cpu")
+        img_array = np.random.randint(0, 255, (300, 451, 3), dtype=np.uint8)
+        buffer = io.BytesIO()
+        Image.fromarray(img_array).save(buffer, format="PNG")
+
+        tensor = classifier.preprocess_bytes(buffer.getvalue(), "image/png")
+
+        resized = cv2.resize(
+            img_array,
+            classifier._resized_size(451, 300),
+            interpolation=cv2.INTER_LINEAR,
+        )
+        expected = classifier._normalize(classifier._center_crop(resized))
+        assert tensor.shape == (1, 3, 224, 224)
+        torch.testing.assert_close(tensor[0], expected, atol=0.05, rtol=0)
+
+    def test_predict_bytes_matches_predict(self, classifier, sample_image):
+        """Test that predicting from encoded bytes matches predicting from PIL."""
+        buffer = io.BytesIO()
+        sample_image.save(buffer, format="BMP")
+
+        from_bytes = classifier.predict_bytes(buffer.getvalue(), "image/bmp", top_k=3)
+        from_image = classifier.predict(sample_image, top_k=3)
+
+        assert [name for name, _ in from_bytes] == [name for name, _ in from_image]
+
+    def test_postprocess_matches_full_softmax(self, classifier):
+        """Test that top K confidences equal the full softmax probabilities."""
+        logits = torch.randn(2, 1000)
+
+        predictions = classifier.postprocess(logits, [3, 5])
+
+        expected_probs, expected_indices = torch.softmax(logits, dim=1).topk(5)
+        for row, top_k in enumerate([3, 5]):
+            assert [name for name, _ in predictions[row]] == [
+                classifier.class_labels[i] for i in expected_indices[row, :top_k]
+            ]
+            torch.testing.assert_close(
+                torch.tensor([prob for _, prob in predictions[row]]),
+                expected_probs[row, :top_k],
+            )
+
+    def test_predict_batch_reuses_input_buffer(self, classifier, sample_tensor):
+        """Test that batches are staged into one preallocated buffer."""
+
+        first = classifier.predict_batch([sample_tensor], [5])
+        buffer_ptr = classifier._input_buf.data_ptr()
+        second = classifier.predict_batch([sample_tensor, sample_tensor], [5, 5])
+
+        assert classifier._input_buf.data_ptr() == buffer_ptr
+        for predictions in second:
+            assert [name for name, _ in predictions] == [name for name, _ in first[0]]
+            assert [prob for _, prob in predictions] == pytest.approx(
+                [prob for _, prob in first[0]], rel=1e-4
+            )
+
+    def test_predict_batch_pads_to_compiled_size(
+        self, classifier, sample_tensor, monkeypatch
+    ):
+        """Test that padded batches return one result per real image."""
+
+        expected = classifier.predict_batch([sample_tensor], [5])[0]
+        monkeypatch.setattr(classifier, "_batch_sizes", [1, 4])
+        model = classifier.model
+        seen_sizes = []
+
+        def forward(batch):
+            seen_sizes.append(batch.shape[0])
+            return model(batch)
+
+        monkeypatch.setattr(classifier, "model", forward)
+        predictions = classifier.predict_batch([sample_tensor] * 3, [5] * 3)
+
+        assert seen_sizes == [4]
+        assert len(predictions) == 3
+        for prediction in predictions:
+            assert [name for name, _ in prediction] == [name for name, _ in expected]
+            assert [prob for _, prob in prediction] == pytest.approx(
+                [prob for _, prob in expected], rel=1e-4
+            )
+
+    def test_compile_covers_every_padded_size(self, monkeypatch):
+        """Test that every padded batch size fits under dynamo's recompile limit."""
+        monkeypatch.setattr(settings, "batch_max_size", 256)
+        monkeypatch.setattr(torch._dynamo.config, "cache_size_limit", 8)
+        # Only the batch size bookkeeping is under test, not compilation
+        monkeypatch.setattr(torch, "compile", lambda model, **kwargs: model)
+        classifier = ImageClassifier(device="cpu")
+        classifier.model = torch.nn.Identity()
 
-    def test_predict_sorted_by_confidence(self, sample_image):
-        """Test that predictions are sorted by confidence in descending order."""
-        classifier = ImageClassifier()
-        predictions = classifier.predict(sample_image, top_k=5)
+        classifier._compile_model()
 
-        probabilities = [prob for _, prob in predictions]
-        # Check that probabilities are in descending order
-        assert probabilities == sorted(probabilities, reverse=True)
+        assert classifier._batch_sizes == [1, 2, 4, 8, 16, 32, 64, 128, 256]
+        assert torch._dynamo.config.cache_size_limit >= 9
 
     def test_model_lazy_loading(self):
         """Test that model is loaded only when needed."""
-        classifier = ImageClassifier()
+        classifier = ImageClassifier(device="cpu")
         assert classifier.model is None
 
-        # Create a sample image and predict
-        sample_img = Image.new("RGB", (224, 224))
-        classifier.predict(sample_img)
+        # Trigger the lazy load directly (predict calls it on first use)
+        classifier._load_model()
 
         # Model should now be loaded
         assert classifier.model is not None
 
-    def test_get_classifier_singleton(self):
+    def test_get_classifier_singleton(self, classifier):
         """Test that get_classifier returns the same instance."""
-        classifier1 = get_classifier()
-        classifier2 = get_classifier()
-
-        assert classifier1 is classifier2
+        assert get_classifier() is classifier
+        assert get_classifier() is get_classifier()
 
 
 class TestClassifierEdgeCases:
     """Test edge cases and error handling."""
 
-    def test_predict_with_different_top_k(self, sample_image):
-        """Test prediction with different top_k values."""
-        classifier = ImageClassifier()
+    @pytest.mark.parametrize("size", [(50, 50), (1000, 1000)], ids=["small", "large"])
+    def test_predict_resizes(self, classifier, size):
+        """Test that small and large images are properly resized."""
+        predictions = classifier.predict(Image.new("RGB", size), top_k=3)
+        assert len(predictions) == 3
 
-        predictions_3 = classifier.predict(sample_image, top_k=3)
-        predictions_10 = classifier.predict(sample_image, top_k=10)
 
-        assert len(predictions_3) == 3
-        assert len(predictions_10) == 10
+class TestPredictionBatcher:
+    """Test cases for the request micro-batcher."""
 
-    def test_predict_with_small_image(self):
-        """Test that small images are properly resized."""
-        classifier = ImageClassifier()
-        small_image = Image.new("RGB", (50, 50))
+    def test_batcher_coalesces_concurrent_requests(
+        self, classifier, sample_tensor, monkeypatch
+    ):
+        """Test that concurrent submissions share one forward pass."""
+        batcher = PredictionBatcher(classifier, max_batch_size=8, max_wait_ms=50)
 
-        predictions = classifier.predict(small_image, top_k=3)
-        assert len(predictions) == 3
+        batch_sizes = []
+        predict_batch = classifier.predict_batch
 
-    def test_predict_with_large_image(self):
-        """Test that large images are properly resized."""
-        classifier = ImageClassifier()
-        large_image = Image.new("RGB", (1000, 1000))
+        def recording_predict_batch(img_tensors, top_ks):
+            batch_sizes.append(len(img_tensors))
+            return predict_batch(img_tensors, top_ks)
 
-        predictions = classifier.predict(large_image, top_k=3)
-        assert len(predictions) == 3
+        monkeypatch.setattr(classifier, "predict_batch", recording_predict_batch)
+
+        async def submit_all():
+            results = await asyncio.gather(
+                *(batcher.submit(sample_tensor, top_k) for top_k in (1, 3, 5))
+            )
+            await batcher.stop()
+            return results
+
+        results = asyncio.run(submit_all())
+
+        assert batch_sizes == [3]
+        assert [len(predictions) for predictions in results] == [1, 3, 5]
+
+
+class TestModelConfig:
+    """Test cases for model loading options."""
+
+    def test_int8_quantization_is_cached(self, sample_tensor, tmp_path, monkeypatch):
+        """Test that INT8 weights are calibrated once and reloaded from disk."""
+        monkeypatch.setattr(settings, "quantize", "int8")
+        monkeypatch.setattr(settings, "weights_cache_dir", str(tmp_path))
+
+        calibrated = ModelConfig.get_model("resnet18", "cpu")
+        assert (tmp_path / "resnet18_int8.pt").exists()
+        reloaded = ModelConfig.get_model("resnet18", "cpu")
+
+        with torch.no_grad():
+            assert torch.equal(calibrated(sample_tensor), reloaded(sample_tensor))
+
+    def test_conv_bn_fusion_preserves_outputs(self, sample_tensor):
+        """Test that BatchNorm is folded away without changing the logits."""
+        fused = ModelConfig.get_model("resnet18", "cpu")
+        reference = ModelConfig.load_pretrained("resnet18", "cpu")
+
+        assert not any(isinstance(m, torch.nn.BatchNorm2d) for m in fused.modules())
+        with torch.no_grad():
+            torch.testing.assert_close(
+                fused(sample_tensor), reference(sample_tensor), atol=1e-4, rtol=1e-4
+            )
+
+    def test_onnx_backend_matches_torch(
+        self, classifier, sample_image, tmp_path, monkeypatch
+    ):
+        """Test that the ONNX Runtime backend agrees with eager PyTorch."""
+        monkeypatch.setattr(settings, "weights_cache_dir", str(tmp_path))
+
+        onnx_predictions = OnnxImageClassifier(device="cpu").predict(
+            sample_image, top_k=5
+        )
+        torch_predictions = classifier.predict(sample_image, top_k=5)
+
+        assert (tmp_path / "resnet18.onnx").exists()
+        assert [name for name, _ in onnx_predictions] == [
+            name for name, _ in torch_predictions
+        ]